@@ -17,4 +17,14 @@ MIN_POST_INTERVAL = 600  # 10 минут
 MAX_POST_INTERVAL = 7200  # 2 часа
 DB_PATH = os.getenv("DB_PATH", "articles.db")
 MODEL = "deepseek/deepseek-chat-v3-0324:free"
-PROMPT_STYLE = "Стиль максимально простой и приближённый к человеческому." 
\ No newline at end of file
+PROMPT_STYLE = "Стиль максимально простой и приближённый к человеческому."
+
+# Пакетный режим: сколько статей переписывать одним запросом к OpenRouter (1 — отключить)
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "3"))
+
+# Парсер текста статьи из реестра utils.TEXT_EXTRACTORS
+TEXT_EXTRACTOR = os.getenv("TEXT_EXTRACTOR", "newspaper")
+# Фоновая загрузка тяжёлых парсеров сразу после старта (иначе — при первом использовании)
+PRELOAD_EXTRACTORS = os.getenv("PRELOAD_EXTRACTORS", "1").lower() in ("1", "true", "yes")
+# Режим профилирования старта: логировать стоимость импорта и инициализации по модулям
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "0").lower() in ("1", "true", "yes")
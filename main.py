@@ -1,13 +1,24 @@
+# Импортируем первым, чтобы отсчёт профиля старта начинался как можно раньше
+from profiling import startup_step, report_startup_profile
 import asyncio
 import logging
-from aiogram import Bot
-from config import TELEGRAM_TOKEN, TELEGRAM_CHANNEL, RSS_FEEDS, RSS_FEED_PRIORITIES, CHECK_INTERVAL, MIN_POST_INTERVAL, MAX_POST_INTERVAL, DB_PATH
-from storage import Storage
-from rss import fetch_new_articles
-from openrouter import rewrite_article, format_article, validate_telegram_html
-from utils import extract_best_image_url_from_entry, download_image
-from telegram_bot import send_article
-from dateutil import parser as date_parser
+with startup_step("import aiogram"):
+    from aiogram import Bot
+with startup_step("import config"):
+    from config import TELEGRAM_TOKEN, TELEGRAM_CHANNEL, RSS_FEEDS, RSS_FEED_PRIORITIES, CHECK_INTERVAL, MIN_POST_INTERVAL, MAX_POST_INTERVAL, DB_PATH, BATCH_SIZE, PRELOAD_EXTRACTORS, STARTUP_PROFILE, TEXT_EXTRACTOR
+with startup_step("import storage"):
+    from storage import Storage
+# Тяжёлые парсеры (newspaper3k, BeautifulSoup, lxml, requests) utils загружает лениво
+with startup_step("import utils"):
+    from utils import extract_best_image_url_from_entry, download_image, preload_backends, TEXT_EXTRACTORS
+with startup_step("import rss"):
+    from rss import fetch_new_articles
+with startup_step("import openrouter"):
+    from openrouter import rewrite_article, format_article, validate_telegram_html, rewrite_articles_batch, format_articles_batch
+with startup_step("import telegram_bot"):
+    from telegram_bot import send_article
+with startup_step("import dateutil"):
+    from dateutil import parser as date_parser
 import datetime
 import random
 import re
@@ -44,6 +55,27 @@ def get_priority_article(articles):
     # Если ничего не нашли — просто самую свежую
     return get_latest_article(articles)
 
+def get_priority_articles(articles, count):
+    # Отбираем до count статей в порядке приоритета для пакетной обработки
+    remaining = list(articles)
+    selected = []
+    while remaining and len(selected) < count:
+        article = get_priority_article(remaining)
+        if not article:
+            break
+        selected.append(article)
+        remaining.remove(article)
+    return selected
+
+def select_batch_articles(pending_articles, new_articles, count):
+    # Отложенные из-за rate limit статьи идут первыми: они уже отмечены в БД и иначе потерялись бы.
+    # Оставшиеся места заполняем новыми статьями по приоритету источника.
+    # Возвращает (статьи для пакета, отложенные статьи, не попавшие в пакет).
+    selected = pending_articles[:count]
+    remaining = pending_articles[count:]
+    selected += get_priority_articles(new_articles, count - len(selected))
+    return selected, remaining
+
 def get_smart_interval(last_post_time, activity_level=1):
     # activity_level: 1 — мало новостей, 2 — средне, 3 — много
     now = datetime.datetime.now()
@@ -96,78 +128,186 @@ def is_image_relevant(image_url, title, summary):
     words = [w.lower() for w in re.findall(r'\w+', text) if len(w) > 3]
     return any(w in image_url.lower() for w in words)
 
+def make_post_data(article):
+    # Создаём объект post_data для передачи на всех этапах
+    post_data = dict(article)
+    logging.info(f"Processing article: {post_data['title']} | link={post_data.get('link')}")
+    # Логируем длину и превью текста статьи перед генерацией
+    content_preview = post_data.get('content', '')[:200]
+    content_len = len(post_data.get('content', ''))
+    logging.info(f"PROMPT DEBUG: article link={post_data.get('link')}, content_len={content_len}, content_preview={content_preview}")
+    # Обрезаем текст для нейросети, если он слишком длинный
+    short_content = post_data.get('content', '')
+    if len(short_content) > 1200:
+        short_content = short_content[:1200] + '...'
+    post_data['short_content'] = short_content
+    logging.info(f"SHORT PROMPT DEBUG: article link={post_data.get('link')}, short_content_len={len(short_content)}, short_content_preview={short_content[:200]}")
+    return post_data
+
+async def generate_raw_post(post_data):
+    # Генерация и проверка полноты
+    logging.info(f"GEN DEBUG: before rewrite_article: title={post_data.get('title')}, link={post_data.get('link')}, summary={post_data.get('summary')}")
+    raw_post = None
+    for attempt in range(3):
+        # Передаём короткий текст в нейросеть
+        raw_post = await rewrite_article({**post_data, 'content': post_data['short_content']})
+        if raw_post == 'RATE_LIMIT_429':
+            logging.warning("OpenRouter rate limit reached, waiting 60 seconds before retry...")
+            await asyncio.sleep(60)
+            continue
+        if raw_post and is_article_complete(raw_post, post_data.get('title')):
+            break
+        logging.warning(f"Article not complete or generation failed, retrying generation ({attempt+1}/3)...")
+        await asyncio.sleep(5)
+    logging.info(f"GEN DEBUG: after rewrite_article: title={post_data.get('title')}, link={post_data.get('link')}, summary={post_data.get('summary')}, generated_text={raw_post}")
+    if not raw_post or not is_article_complete(raw_post, post_data.get('title')):
+        logging.error("Failed to generate complete article text. Skipping.")
+        return None
+    return raw_post
+
+async def generate_formatted_post(raw_post, post_data):
+    for attempt in range(3):
+        candidate = await format_article(raw_post)
+        if candidate and is_article_complete(candidate, post_data.get('title')) and validate_telegram_html(candidate):
+            return candidate
+        logging.warning(f"Format attempt {attempt+1} failed Telegram validation or completeness, retrying...")
+        await asyncio.sleep(5)
+    logging.error("All format attempts failed. Skipping article.")
+    return None
+
+async def prepare_post(article):
+    post_data = make_post_data(article)
+    # Статья могла быть уже переписана в пакете и отложена на этапе форматирования
+    raw_post = post_data.get('raw_post') or await generate_raw_post(post_data)
+    if not raw_post:
+        return None
+    await asyncio.sleep(15)
+    formatted_post = await generate_formatted_post(raw_post, post_data)
+    if not formatted_post:
+        return None
+    post_data['post_text'] = formatted_post
+    return post_data
+
+async def prepare_posts_batch(articles):
+    # Пакетный режим: несколько статей в одном запросе на переписывание и одном на форматирование.
+    # Статьи, которые не удалось разобрать из пакетного ответа, обрабатываются по одной.
+    # При rate limit одиночные запросы не делаем: статьи откладываются до следующего цикла.
+    # Возвращает (готовые посты, отложенные статьи).
+    posts = [make_post_data(a) for a in articles]
+    # Статьи, отложенные на этапе форматирования, уже переписаны — повторно их не отправляем
+    to_rewrite = [p for p in posts if not p.get('raw_post')]
+    if to_rewrite:
+        logging.info(f"BATCH DEBUG: rewriting {len(to_rewrite)} articles in one request")
+        raw_posts = await rewrite_articles_batch([{**p, 'content': p['short_content']} for p in to_rewrite])
+        if raw_posts == 'RATE_LIMIT_429':
+            logging.warning(f"OpenRouter rate limit reached on batch rewrite, deferring {len(posts)} articles to next cycle.")
+            return [], posts
+        for post_data, raw_post in zip(to_rewrite, raw_posts):
+            if not raw_post or not is_article_complete(raw_post, post_data.get('title')):
+                logging.warning(f"Batch rewrite result not usable, falling back to single request: link={post_data.get('link')}")
+                raw_post = await generate_raw_post(post_data)
+            post_data['raw_post'] = raw_post
+        await asyncio.sleep(15)
+    ready = [p for p in posts if p.get('raw_post')]
+    if not ready:
+        return [], []
+    logging.info(f"BATCH DEBUG: formatting {len(ready)} articles in one request")
+    formatted_posts = await format_articles_batch([p['raw_post'] for p in ready])
+    if formatted_posts == 'RATE_LIMIT_429':
+        logging.warning(f"OpenRouter rate limit reached on batch format, deferring {len(ready)} articles to next cycle.")
+        return [], ready
+    result = []
+    for post_data, formatted_post in zip(ready, formatted_posts):
+        if not formatted_post or not is_article_complete(formatted_post, post_data.get('title')):
+            logging.warning(f"Batch format result not usable, falling back to single request: link={post_data.get('link')}")
+            formatted_post = await generate_formatted_post(post_data['raw_post'], post_data)
+            if not formatted_post:
+                continue
+        post_data['post_text'] = formatted_post
+        result.append(post_data)
+    return result, []
+
+async def publish_post(bot, post_data):
+    # Проверка релевантности картинки
+    img_url = post_data.get("image_url")
+    # Подробное логирование перед отправкой
+    logging.info(f"POST DEBUG: title={post_data.get('title')}, link={post_data.get('link')}, summary={post_data.get('summary')}, image_url={img_url}, post_text={post_data.get('post_text')}")
+    img_bytes = await download_image(img_url) if img_url else None
+    await send_article(bot, TELEGRAM_CHANNEL, post_data['post_text'], img_bytes)
+    logging.info(f"Article sent: {post_data['title']} | link={post_data.get('link')}")
+
+async def preload_extractors():
+    # Фоновая загрузка парсеров, пока бот уже работает
+    await preload_backends()
+    if STARTUP_PROFILE:
+        report_startup_profile("Startup profile (after extractors preload)")
+
 async def main():
     logging.info("Starting bot...")
-    bot = Bot(token=TELEGRAM_TOKEN)
-    storage = Storage(DB_PATH)
+    # Неизвестный парсер молча пропускал бы все статьи — падаем сразу с понятной ошибкой
+    if TEXT_EXTRACTOR not in TEXT_EXTRACTORS:
+        raise ValueError(f"Unknown TEXT_EXTRACTOR '{TEXT_EXTRACTOR}', available: {', '.join(sorted(TEXT_EXTRACTORS))}")
+    with startup_step("init Bot"):
+        bot = Bot(token=TELEGRAM_TOKEN)
+    with startup_step("init Storage"):
+        storage = Storage(DB_PATH)
+    if STARTUP_PROFILE:
+        report_startup_profile()
+    # Парсеры грузятся в фоне, пока скачиваются RSS-ленты; fetch_new_articles дождётся задачи
+    # перед извлечением текста статей
+    preload_task = asyncio.create_task(preload_extractors()) if PRELOAD_EXTRACTORS else None
     last_post_time = None
+    # Готовые посты из пакетной обработки, публикуются по одному за цикл
+    pending_posts = []
+    # Статьи, отложенные из-за rate limit OpenRouter (уже отмечены в БД, иначе потерялись бы)
+    pending_articles = []
     global CHECK_INTERVAL
 
     async def check_and_post():
         nonlocal last_post_time
         try:
+            if pending_posts:
+                # Сначала публикуем уже подготовленные посты, не расходуя квоту OpenRouter
+                post_data = pending_posts.pop(0)
+                logging.info(f"Publishing queued article ({len(pending_posts)} left in queue): {post_data['title']} | link={post_data.get('link')}")
+                await publish_post(bot, post_data)
+                last_post_time = datetime.datetime.now()
+                return
             logging.info("Checking for new articles...")
-            articles = fetch_new_articles(RSS_FEEDS, storage)
-            if not articles:
+            articles = await fetch_new_articles(RSS_FEEDS, storage, preload_task)
+            if not articles and not pending_articles:
                 logging.info("No new articles found.")
                 logging.info(f"Next check in {CHECK_INTERVAL} seconds.")
                 return
-            # Выбираем статью по приоритету источника
-            latest = get_priority_article(articles)
-            if not latest:
-                logging.info("No valid latest article found.")
-                return
-            # Создаём объект post_data для передачи на всех этапах
-            post_data = dict(latest)
-            logging.info(f"Processing latest article: {post_data['title']} | link={post_data.get('link')}")
-            # Логируем длину и превью текста статьи перед генерацией
-            content_preview = post_data.get('content', '')[:200]
-            content_len = len(post_data.get('content', ''))
-            logging.info(f"PROMPT DEBUG: article link={post_data.get('link')}, content_len={content_len}, content_preview={content_preview}")
-            # Обрезаем текст для нейросети, если он слишком длинный
-            short_content = post_data.get('content', '')
-            if len(short_content) > 1200:
-                short_content = short_content[:1200] + '...'
-            post_data['short_content'] = short_content
-            logging.info(f"SHORT PROMPT DEBUG: article link={post_data.get('link')}, short_content_len={len(short_content)}, short_content_preview={short_content[:200]}")
-            # Генерация и проверка полноты
-            logging.info(f"GEN DEBUG: before rewrite_article: title={post_data.get('title')}, link={post_data.get('link')}, summary={post_data.get('summary')}")
-            raw_post = None
-            for attempt in range(3):
-                # Передаём короткий текст в нейросеть
-                raw_post = await rewrite_article({**post_data, 'content': short_content})
-                if raw_post == 'RATE_LIMIT_429':
-                    logging.warning("OpenRouter rate limit reached, waiting 60 seconds before retry...")
-                    await asyncio.sleep(60)
-                    continue
-                if raw_post and is_article_complete(raw_post, post_data.get('title')):
-                    break
-                logging.warning(f"Article not complete or generation failed, retrying generation ({attempt+1}/3)...")
-                await asyncio.sleep(5)
-            logging.info(f"GEN DEBUG: after rewrite_article: title={post_data.get('title')}, link={post_data.get('link')}, summary={post_data.get('summary')}, generated_text={raw_post}")
-            if not raw_post or not is_article_complete(raw_post, post_data.get('title')):
-                logging.error("Failed to generate complete article text. Skipping.")
-                return
-            await asyncio.sleep(15)
-            formatted_post = None
-            for attempt in range(3):
-                candidate = await format_article(raw_post)
-                if candidate and is_article_complete(candidate, post_data.get('title')) and validate_telegram_html(candidate):
-                    formatted_post = candidate
-                    break
-                logging.warning(f"Format attempt {attempt+1} failed Telegram validation or completeness, retrying...")
-                await asyncio.sleep(5)
-            if not formatted_post:
-                logging.error("All format attempts failed. Skipping article.")
-                return
-            post_data['post_text'] = formatted_post
-            # Проверка релевантности картинки
-            img_url = post_data.get("image_url")
-            # Подробное логирование перед отправкой
-            logging.info(f"POST DEBUG: title={post_data.get('title')}, link={post_data.get('link')}, summary={post_data.get('summary')}, image_url={img_url}, post_text={post_data.get('post_text')}")
-            img_bytes = await download_image(img_url) if img_url else None
-            await send_article(bot, TELEGRAM_CHANNEL, post_data['post_text'], img_bytes)
-            logging.info(f"Article sent: {post_data['title']} | link={post_data.get('link')}")
+            if BATCH_SIZE > 1 and len(pending_articles) + len(articles) > 1:
+                # Много статей — обрабатываем пачкой: сначала отложенные, затем новые по приоритету источника
+                if pending_articles:
+                    logging.info(f"Retrying {len(pending_articles)} articles deferred by rate limit")
+                selected, remaining = select_batch_articles(pending_articles, articles, BATCH_SIZE)
+                pending_articles[:] = remaining
+                posts, deferred = await prepare_posts_batch(selected)
+                pending_articles.extend(deferred)
+                if not posts:
+                    if deferred:
+                        logging.warning(f"Batch of {len(deferred)} articles deferred to next cycle due to rate limit.")
+                    else:
+                        logging.error("Failed to prepare any article from batch. Skipping.")
+                    return
+                post_data = posts[0]
+                pending_posts.extend(posts[1:])
+            else:
+                # Единственная статья может быть и отложенной
+                articles = pending_articles + articles
+                pending_articles.clear()
+                # Выбираем статью по приоритету источника
+                latest = get_priority_article(articles)
+                if not latest:
+                    logging.info("No valid latest article found.")
+                    return
+                post_data = await prepare_post(latest)
+                if not post_data:
+                    return
+            await publish_post(bot, post_data)
             last_post_time = datetime.datetime.now()
         except Exception as e:
             logging.error(f"An error occurred in check_and_post: {e}")
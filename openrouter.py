@@ -14,6 +14,50 @@ RATE_LIMIT_DELAY = 10  # секунды при 429
 
 TELEGRAM_ALLOWED_TAGS = {"b", "i", "u", "code", "pre"}
 
+# Маркеры для пакетного режима: несколько статей в одном запросе
+BATCH_INPUT_MARKER = "===СТАТЬЯ {}==="
+BATCH_OUTPUT_MARKER = "===ОТВЕТ {}==="
+# Модель может обернуть маркер в markdown (**, #, `) — допускаем это по краям строки
+BATCH_OUTPUT_PATTERN = re.compile(r"^[ \t*#`]*===[ \t]*ОТВЕТ[ \t]+(\d+)[ \t]*===[ \t*#`]*$", re.MULTILINE)
+# Маркер конца пакетного ответа: всё после него (приписки модели) отбрасывается
+BATCH_END_MARKER = "===КОНЕЦ==="
+BATCH_END_PATTERN = re.compile(r"^[ \t*#`]*===[ \t]*КОНЕЦ[ \t]*===[ \t*#`]*$", re.MULTILINE)
+
+REWRITE_RULES = """Перепиши новостную статью в живом, разговорном и эмоциональном стиле для Telegram-канала.
+
+- Не упоминай СМИ, источники, ссылки, не используй фразы вроде «по словам», «сообщает», «источник».
+- Сделай яркий, цепляющий заголовок с эмодзи, выдели его тегом <b>.
+- Разбей текст на короткие абзацы, используй поддерживаемые Telegram HTML-теги: <b>, <i>, <u>.
+- Добавь эмоциональные и мотивирующие фразы, обращайся к читателю, делай выводы, добавь финальный мотивирующий абзац (выдели его курсивом с помощью <i>).
+- Не используй сухие формулировки, избегай официального стиля.
+- Не добавляй никакие ссылки, имена СМИ, имена журналистов, даты, геометки.
+- Не используй списки, только абзацы.
+- Не пиши ничего вне самой новости.
+
+Пример структуры:
+<b>🔥 Яркий заголовок с эмодзи!</b>
+
+Первый абзац — кратко и эмоционально о сути новости.
+
+Второй абзац — детали, мнения, эмоции.
+
+Третий абзац — размышления, выводы, обращение к читателю.
+
+<i>Мотивирующая или обнадёживающая фраза для читателей.</i>
+
+Используй только поддерживаемые Telegram HTML-теги!"""
+
+FORMAT_RULES = """Проверь и отформатируй текст для публикации в Telegram-канале:
+
+- Сохрани яркий заголовок с эмодзи, выдели его тегом <b>.
+- Раздели текст на абзацы для удобства чтения.
+- Используй только поддерживаемые Telegram HTML-теги: <b>, <i>, <u>.
+- Не добавляй ссылки, имена СМИ, даты, геометки, списки.
+- Не меняй смысл, стиль и структуру текста, только улучши читаемость и оформление.
+- В конце добавь мотивирующую или обнадёживающую фразу, выдели её курсивом с помощью <i>.
+
+Итоговый текст должен быть полностью готов к публикации в Telegram-канале."""
+
 
 async def _call_openrouter(messages, timeout=60):
     """
@@ -79,29 +123,7 @@ async def _call_openrouter(messages, timeout=60):
 
 async def rewrite_article(article):
     prompt = f"""
-Перепиши новостную статью в живом, разговорном и эмоциональном стиле для Telegram-канала.
-
-- Не упоминай СМИ, источники, ссылки, не используй фразы вроде «по словам», «сообщает», «источник».
-- Сделай яркий, цепляющий заголовок с эмодзи, выдели его тегом <b>.
-- Разбей текст на короткие абзацы, используй поддерживаемые Telegram HTML-теги: <b>, <i>, <u>.
-- Добавь эмоциональные и мотивирующие фразы, обращайся к читателю, делай выводы, добавь финальный мотивирующий абзац (выдели его курсивом с помощью <i>).
-- Не используй сухие формулировки, избегай официального стиля.
-- Не добавляй никакие ссылки, имена СМИ, имена журналистов, даты, геометки.
-- Не используй списки, только абзацы.
-- Не пиши ничего вне самой новости.
-
-Пример структуры:
-<b>🔥 Яркий заголовок с эмодзи!</b>
-
-Первый абзац — кратко и эмоционально о сути новости.
-
-Второй абзац — детали, мнения, эмоции.
-
-Третий абзац — размышления, выводы, обращение к читателю.
-
-<i>Мотивирующая или обнадёживающая фраза для читателей.</i>
-
-Используй только поддерживаемые Telegram HTML-теги!
+{REWRITE_RULES}
 
 Текст статьи:
 {article['content']}
@@ -123,16 +145,7 @@ async def rewrite_article(article):
 
 async def format_article(text):
     prompt = f"""
-Проверь и отформатируй текст для публикации в Telegram-канале:
-
-- Сохрани яркий заголовок с эмодзи, выдели его тегом <b>.
-- Раздели текст на абзацы для удобства чтения.
-- Используй только поддерживаемые Telegram HTML-теги: <b>, <i>, <u>.
-- Не добавляй ссылки, имена СМИ, даты, геометки, списки.
-- Не меняй смысл, стиль и структуру текста, только улучши читаемость и оформление.
-- В конце добавь мотивирующую или обнадёживающую фразу, выдели её курсивом с помощью <i>.
-
-Итоговый текст должен быть полностью готов к публикации в Telegram-канале.
+{FORMAT_RULES}
 
 Текст для форматирования:
 {text}
@@ -152,6 +165,89 @@ async def format_article(text):
     
     return result
 
+def _build_batch_prompt(rules, task, texts):
+    # Один системный промпт на несколько статей: правила передаются один раз
+    items = "\n\n".join(
+        f"{BATCH_INPUT_MARKER.format(i)}\n{text}" for i, text in enumerate(texts, start=1)
+    )
+    return f"""
+{rules}
+
+Ниже {len(texts)} отдельных текстов, каждый начинается со строки-маркера вида {BATCH_INPUT_MARKER.format('N')}.
+{task} Каждый текст обрабатывай независимо от остальных, по правилам выше.
+
+Формат ответа строго такой: для каждого текста сначала отдельная строка {BATCH_OUTPUT_MARKER.format('N')}, где N — номер исходного текста, затем готовый результат.
+После последнего результата напиши отдельную строку {BATCH_END_MARKER} и больше ничего не пиши.
+Не пропускай номера, не объединяй тексты, не пиши ничего до первого маркера, между результатами и после строки {BATCH_END_MARKER}.
+
+{items}
+"""
+
+def split_batch_response(response, count):
+    """
+    Разбивает ответ пакетного запроса на отдельные результаты по маркерам ===ОТВЕТ N===.
+    Текст после маркера ===КОНЕЦ=== отбрасывается.
+    Возвращает список длины count; на месте не распознанных результатов — None.
+    """
+    results = [None] * count
+    if not response:
+        return results
+    end = BATCH_END_PATTERN.search(response)
+    if end:
+        response = response[:end.start()]
+    matches = list(BATCH_OUTPUT_PATTERN.finditer(response))
+    for pos, match in enumerate(matches):
+        index = int(match.group(1)) - 1
+        end = matches[pos + 1].start() if pos + 1 < len(matches) else len(response)
+        text = response[match.end():end].strip()
+        if not 0 <= index < count:
+            logger.warning(f"Batch response contains unexpected item number {index + 1}, ignoring.")
+            continue
+        if results[index] is not None:
+            logger.warning(f"Batch response contains duplicate item number {index + 1}, ignoring.")
+            continue
+        results[index] = text or None
+    missing = [i + 1 for i, r in enumerate(results) if r is None]
+    if missing:
+        logger.warning(f"Batch response is missing items: {missing}")
+    return results
+
+async def _call_openrouter_batch(rules, task, texts, name):
+    prompt = _build_batch_prompt(rules, task, texts)
+    messages = [{"role": "system", "content": prompt}]
+    # Ответ в пакетном режиме длиннее — увеличиваем таймаут пропорционально размеру пакета
+    result = await _call_openrouter(messages, timeout=60 * len(texts))
+
+    if result == 'RATE_LIMIT_429':
+        logger.error(f"Error in {name}: Rate limit exceeded")
+        return 'RATE_LIMIT_429'
+
+    if not result:
+        logger.error(f"Failed to process batch of {len(texts)} articles after all retries")
+        return [None] * len(texts)
+
+    results = split_batch_response(result, len(texts))
+    logger.info(f"Batch of {len(texts)} articles processed: {sum(r is not None for r in results)} parsed successfully.")
+    return results
+
+async def rewrite_articles_batch(articles):
+    """
+    Переписывает несколько статей одним запросом к OpenRouter.
+    Возвращает список результатов в порядке статей (None для не распознанных) или 'RATE_LIMIT_429'.
+    """
+    texts = [article['content'] for article in articles]
+    return await _call_openrouter_batch(REWRITE_RULES, "Перепиши каждую статью.", texts, "rewrite_articles_batch")
+
+async def format_articles_batch(texts):
+    """
+    Форматирует несколько текстов одним запросом к OpenRouter.
+    Результаты, не прошедшие проверку Telegram HTML, заменяются на None.
+    """
+    results = await _call_openrouter_batch(FORMAT_RULES, "Отформатируй каждый текст.", texts, "format_articles_batch")
+    if results == 'RATE_LIMIT_429':
+        return results
+    return [r if r and validate_telegram_html(r) else None for r in results]
+
 def validate_telegram_html(text):
     # Проверяем, что используются только разрешённые теги Telegram
     tag_pattern = re.compile(r"<(/?)([a-zA-Z0-9\-]+)(?: [^>]*)?>")
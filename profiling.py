@@ -0,0 +1,35 @@
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Момент импорта модуля: отсчёт идёт от него, а не от запуска интерпретатора
+# (время старта самого Python и уже загруженных asyncio/logging сюда не входит)
+STARTUP_BEGIN = time.perf_counter()
+
+# Замеры стоимости импорта и инициализации: список (имя шага, секунды)
+STARTUP_TIMINGS = []
+
+@contextmanager
+def startup_step(name):
+    """
+    Замеряет длительность шага старта (импорт модуля, инициализация) и сохраняет её в STARTUP_TIMINGS.
+    Отдаёт словарь шага: после выхода из блока в нём доступна длительность в step["duration"].
+    """
+    step = {"name": name, "duration": None}
+    start = time.perf_counter()
+    try:
+        yield step
+    finally:
+        step["duration"] = time.perf_counter() - start
+        STARTUP_TIMINGS.append((name, step["duration"]))
+
+def report_startup_profile(title="Startup profile"):
+    """
+    Логирует собранные замеры, от самых долгих к самым быстрым.
+    """
+    total = time.perf_counter() - STARTUP_BEGIN
+    logger.info(f"{title}: {total:.3f}s since profiling import, {len(STARTUP_TIMINGS)} steps")
+    for name, duration in sorted(STARTUP_TIMINGS, key=lambda item: item[1], reverse=True):
+        logger.info(f"  {duration * 1000:8.1f} ms  {name}")
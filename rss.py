@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import feedparser
 from utils import extract_image_url, extract_full_article_text
@@ -5,8 +6,9 @@ from utils import extract_image_url, extract_full_article_text
 logger = logging.getLogger(__name__)
 
 
-def fetch_new_articles(feeds, storage):
-    new_articles = []
+def parse_feeds(feeds):
+    # Разбор RSS-лент не требует тяжёлых парсеров статей
+    entries = []
     for url in feeds:
         logger.info(f"Parsing RSS feed: {url}")
         feed = feedparser.parse(url)
@@ -15,29 +17,51 @@ def fetch_new_articles(feeds, storage):
             continue
 
         for entry in feed.entries:
-            link = entry.get("link")
-            if not link:
+            if not entry.get("link"):
                 logger.warning(
                     f"Skipping entry without link in feed {url}: {entry.get('title')}"
                 )
                 continue
-            published = entry.get("published", "")
-            # Универсальный парсер текста статьи
-            content = extract_full_article_text(link)
-            logger.info(f"ARTICLE DEBUG: title={entry.get('title', '')}, link={link}, content_len={len(content)}, content_preview={content[:200]}")
-            if not content.strip():
-                logger.info(f"SKIP: No full text extracted for article {link}")
-                continue
-            if not storage.is_published(link):
-                logger.info(f"New article found: {link}")
-                image_url = extract_image_url(entry, url)
-                new_articles.append({
-                    "title": entry.get("title", ""),
-                    "link": link,
-                    "published": published,
-                    "summary": entry.get("summary", ""),
-                    "content": content,
-                    "image_url": image_url,
-                })
-                storage.add_article(link, published)
-    return new_articles 
\ No newline at end of file
+            entries.append((url, entry))
+    return entries
+
+
+def extract_article(url, entry):
+    link = entry.get("link")
+    # Универсальный парсер текста статьи
+    content = extract_full_article_text(link)
+    logger.info(f"ARTICLE DEBUG: title={entry.get('title', '')}, link={link}, content_len={len(content)}, content_preview={content[:200]}")
+    if not content.strip():
+        logger.info(f"SKIP: No full text extracted for article {link}")
+        return None
+    return {
+        "title": entry.get("title", ""),
+        "link": link,
+        "published": entry.get("published", ""),
+        "summary": entry.get("summary", ""),
+        "content": content,
+    }
+
+
+async def fetch_new_articles(feeds, storage, extractors_ready=None):
+    """
+    Сетевые запросы и парсинг выполняются в отдельных потоках, чтобы не блокировать event loop.
+    extractors_ready — задача фоновой загрузки парсеров: ленты разбираются параллельно с ней,
+    а извлечение текста статей начинается после её завершения.
+    Работа с storage остаётся в потоке event loop (соединение sqlite привязано к нему).
+    """
+    entries = await asyncio.to_thread(parse_feeds, feeds)
+    if extractors_ready is not None:
+        await extractors_ready
+    new_articles = []
+    for url, entry in entries:
+        article = await asyncio.to_thread(extract_article, url, entry)
+        if not article:
+            continue
+        link = article["link"]
+        if not storage.is_published(link):
+            logger.info(f"New article found: {link}")
+            article["image_url"] = await asyncio.to_thread(extract_image_url, entry, url)
+            new_articles.append(article)
+            storage.add_article(link, article["published"])
+    return new_articles
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+import main
+
+RAW_POST = "<b>🔥 Заголовок</b>\n\n" + "Текст новости. " * 30
+
+
+def _article(n):
+    return {
+        "title": f"Новость {n}",
+        "link": f"https://example.com/{n}",
+        "published": "",
+        "summary": "",
+        "content": f"Текст статьи {n}",
+    }
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    async def fake_sleep(_):
+        pass
+    monkeypatch.setattr(main.asyncio, "sleep", fake_sleep)
+
+
+def test_prepare_posts_batch_rewrite_rate_limit_defers_all(monkeypatch):
+    single_calls = []
+
+    async def rewrite_batch(articles):
+        return 'RATE_LIMIT_429'
+
+    async def rewrite_single(article):
+        single_calls.append(article["link"])
+        return RAW_POST
+
+    monkeypatch.setattr(main, "rewrite_articles_batch", rewrite_batch)
+    monkeypatch.setattr(main, "rewrite_article", rewrite_single)
+
+    posts, deferred = asyncio.run(main.prepare_posts_batch([_article(1), _article(2)]))
+
+    assert posts == []
+    assert [p["link"] for p in deferred] == ["https://example.com/1", "https://example.com/2"]
+    assert single_calls == []
+
+
+def test_prepare_posts_batch_format_rate_limit_keeps_raw_post(monkeypatch):
+    rewrite_calls = []
+    format_calls = []
+    format_results = ['RATE_LIMIT_429', [RAW_POST + "1", RAW_POST + "2"]]
+
+    async def rewrite_batch(articles):
+        rewrite_calls.append([a["link"] for a in articles])
+        return [RAW_POST + "1", RAW_POST + "2"]
+
+    async def format_batch(texts):
+        format_calls.append(list(texts))
+        return format_results.pop(0)
+
+    monkeypatch.setattr(main, "rewrite_articles_batch", rewrite_batch)
+    monkeypatch.setattr(main, "format_articles_batch", format_batch)
+
+    posts, deferred = asyncio.run(main.prepare_posts_batch([_article(1), _article(2)]))
+    assert posts == []
+    assert [p["raw_post"] for p in deferred] == [RAW_POST + "1", RAW_POST + "2"]
+
+    # Повторная обработка отложенных статей: только форматирование, без переписывания
+    posts, deferred = asyncio.run(main.prepare_posts_batch(deferred))
+    assert deferred == []
+    assert [p["post_text"] for p in posts] == [RAW_POST + "1", RAW_POST + "2"]
+    assert len(rewrite_calls) == 1
+    assert format_calls == [[RAW_POST + "1", RAW_POST + "2"]] * 2
+
+
+def test_prepare_posts_batch_missing_item_falls_back_to_single_request(monkeypatch):
+    single_calls = []
+
+    async def rewrite_batch(articles):
+        return [RAW_POST, None]
+
+    async def rewrite_single(article):
+        single_calls.append(article["link"])
+        return RAW_POST
+
+    async def format_batch(texts):
+        return list(texts)
+
+    monkeypatch.setattr(main, "rewrite_articles_batch", rewrite_batch)
+    monkeypatch.setattr(main, "rewrite_article", rewrite_single)
+    monkeypatch.setattr(main, "format_articles_batch", format_batch)
+
+    posts, deferred = asyncio.run(main.prepare_posts_batch([_article(1), _article(2)]))
+
+    assert single_calls == ["https://example.com/2"]
+    assert [p["link"] for p in posts] == ["https://example.com/1", "https://example.com/2"]
+    assert deferred == []
+
+
+def test_select_batch_articles_takes_deferred_first():
+    pending = [_article(1), _article(2), _article(3)]
+    new = [_article(4), _article(5)]
+
+    selected, remaining = main.select_batch_articles(pending, new, 2)
+    assert [a["link"] for a in selected] == ["https://example.com/1", "https://example.com/2"]
+    assert [a["link"] for a in remaining] == ["https://example.com/3"]
+
+    selected, remaining = main.select_batch_articles(remaining, new, 2)
+    assert [a["link"] for a in selected][0] == "https://example.com/3"
+    assert len(selected) == 2
+    assert remaining == []
@@ -0,0 +1,42 @@
+from openrouter import BATCH_END_MARKER, _build_batch_prompt, split_batch_response
+
+
+def test_split_batch_response_plain_markers():
+    response = "===ОТВЕТ 1===\n<b>Первый</b>\nтекст\n\n===ОТВЕТ 2===\nвторой"
+    assert split_batch_response(response, 2) == ["<b>Первый</b>\nтекст", "второй"]
+
+
+def test_split_batch_response_missing_item():
+    response = "===ОТВЕТ 1===\nпервый\n===ОТВЕТ 3===\nтретий"
+    assert split_batch_response(response, 3) == ["первый", None, "третий"]
+
+
+def test_split_batch_response_duplicate_item_keeps_first():
+    response = "===ОТВЕТ 1===\nпервый\n===ОТВЕТ 1===\nповтор"
+    assert split_batch_response(response, 1) == ["первый"]
+
+
+def test_split_batch_response_out_of_range_item_ignored():
+    response = "===ОТВЕТ 1===\nпервый\n===ОТВЕТ 5===\nлишний\n===ОТВЕТ 0===\nнулевой"
+    assert split_batch_response(response, 2) == ["первый", None]
+
+
+def test_split_batch_response_decorated_markers():
+    response = "**===ОТВЕТ 1===**\nпервый\n## === ОТВЕТ 2 ===\nвторой\n`===ОТВЕТ 3===`\nтретий"
+    assert split_batch_response(response, 3) == ["первый", "второй", "третий"]
+
+
+def test_split_batch_response_empty_response():
+    assert split_batch_response("", 2) == [None, None]
+    assert split_batch_response(None, 1) == [None]
+
+
+def test_split_batch_response_drops_text_after_end_marker():
+    response = "===ОТВЕТ 1===\nпервый\n===ОТВЕТ 2===\nвторой\n**===КОНЕЦ===**\nНадеюсь, помог!"
+    assert split_batch_response(response, 2) == ["первый", "второй"]
+
+
+def test_build_batch_prompt_asks_for_end_marker():
+    prompt = _build_batch_prompt("ПРАВИЛА", "Перепиши каждую статью.", ["один", "два"])
+    assert BATCH_END_MARKER in prompt
+    assert "===СТАТЬЯ 2===\nдва" in prompt
@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import utils
+
+HEAVY_MODULES = ["lxml", "bs4", "requests", "newspaper", "nltk", "PIL"]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_utils_does_not_load_heavy_modules():
+    # Отдельный процесс: в текущем тяжёлые модули мог уже загрузить другой тест
+    code = (
+        "import json, sys, utils; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+@pytest.fixture
+def backend_registry(monkeypatch):
+    monkeypatch.setattr(utils, "_BACKEND_LOADERS", {})
+    monkeypatch.setattr(utils, "_loaded_backends", {})
+    monkeypatch.setattr(utils, "_backend_locks", {})
+
+
+def test_get_backend_calls_loader_once(backend_registry):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return object()
+
+    utils.register_backend("test_backend", loader)
+    first = utils.get_backend("test_backend")
+    assert utils.get_backend("test_backend") is first
+    assert calls == [1]
+
+
+def test_get_backend_unknown_name_raises(backend_registry):
+    with pytest.raises(KeyError):
+        utils.get_backend("missing_backend")
+
+
+def test_extract_full_article_text_dispatches_to_registered_extractor(monkeypatch):
+    monkeypatch.setitem(utils.TEXT_EXTRACTORS, "fake", lambda url: f"text from {url}")
+    assert utils.extract_full_article_text("https://example.com/1", extractor="fake") == "text from https://example.com/1"
+
+
+def test_extract_full_article_text_unknown_extractor_returns_empty():
+    assert utils.extract_full_article_text("https://example.com/1", extractor="missing") == ""
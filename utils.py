@@ -1,14 +1,15 @@
 import logging
 import httpx
-from lxml import html
+import importlib
 import re
-import requests
-from bs4 import BeautifulSoup
+import threading
 from urllib.parse import urlparse
-from newspaper import Article
 import asyncio
 import time
 
+from config import TEXT_EXTRACTOR, STARTUP_PROFILE
+from profiling import startup_step
+
 logger = logging.getLogger(__name__)
 
 # Константы для retry логики
@@ -16,6 +17,69 @@ MAX_RETRIES = 3
 RETRY_DELAY = 2  # секунды
 RATE_LIMIT_DELAY = 10  # секунды при 429
 
+# Реестр тяжёлых бэкендов извлечения (newspaper3k, BeautifulSoup, lxml, requests).
+# Модули импортируются при первом использовании или фоновой предзагрузкой,
+# чтобы импорт utils не замедлял старт бота.
+_BACKEND_LOADERS = {}
+_loaded_backends = {}
+_backend_locks = {}
+_backends_registry_lock = threading.Lock()
+
+# Реестр функций извлечения текста статьи: имя -> функция(url) -> str
+TEXT_EXTRACTORS = {}
+
+def register_backend(name, loader):
+    """
+    Регистрирует ленивый бэкенд: loader вызывается один раз при первом обращении.
+    """
+    with _backends_registry_lock:
+        _BACKEND_LOADERS[name] = loader
+        _backend_locks.setdefault(name, threading.Lock())
+
+def get_backend(name):
+    """
+    Возвращает загруженный бэкенд, импортируя его при первом обращении.
+    """
+    if name in _loaded_backends:
+        return _loaded_backends[name]
+    if name not in _BACKEND_LOADERS:
+        raise KeyError(f"Unknown extraction backend: {name}")
+    with _backend_locks[name]:
+        if name not in _loaded_backends:
+            with startup_step(f"backend {name}") as step:
+                _loaded_backends[name] = _BACKEND_LOADERS[name]()
+            logger.info(f"Extraction backend loaded: {name}")
+            # Бэкенды грузятся и после общего отчёта о старте — логируем их стоимость сразу
+            if STARTUP_PROFILE:
+                logger.info(f"Startup profile: backend {name} loaded in {step['duration'] * 1000:.1f} ms")
+    return _loaded_backends[name]
+
+def _load_backends(names):
+    for name in names:
+        try:
+            get_backend(name)
+        except Exception as e:
+            logger.error(f"Error preloading extraction backend {name}: {e}")
+
+async def preload_backends(names=None):
+    """
+    Загружает бэкенды в фоновом потоке, не блокируя event loop.
+    Если парсер понадобится раньше, get_backend дождётся окончания его загрузки.
+    """
+    await asyncio.to_thread(_load_backends, list(names or _BACKEND_LOADERS))
+
+def register_text_extractor(name):
+    # Декоратор для подключения альтернативных парсеров текста статьи
+    def decorator(func):
+        TEXT_EXTRACTORS[name] = func
+        return func
+    return decorator
+
+register_backend("lxml", lambda: importlib.import_module("lxml.html"))
+register_backend("requests", lambda: importlib.import_module("requests"))
+register_backend("bs4", lambda: importlib.import_module("bs4").BeautifulSoup)
+register_backend("newspaper", lambda: importlib.import_module("newspaper").Article)
+
 def try_get_hq_image(url):
     # Попытка получить ссылку на оригинал по шаблону
     if not url:
@@ -89,7 +153,7 @@ def extract_best_image_url_from_entry(entry):
             html_content = html_content[0].get('value', '')
         if html_content:
             try:
-                tree = html.fromstring(html_content)
+                tree = get_backend("lxml").fromstring(html_content)
                 img = tree.xpath('//img/@src')
                 if img:
                     url = try_get_hq_image(img[0])
@@ -151,6 +215,8 @@ def extract_image_from_page(url, title=None):
     Ищет изображение только в основном контенте статьи (article, main, .content, .post, .entry, .article-body).
     Если title передан — ищет совпадения по alt/title картинки и словам из заголовка (длина слова > 3).
     """
+    requests = get_backend("requests")
+    BeautifulSoup = get_backend("bs4")
     for attempt in range(MAX_RETRIES):
         try:
             # Добавляем задержку между попытками
@@ -208,11 +274,25 @@ def extract_image_from_page(url, title=None):
     
     return None
 
-def extract_full_article_text(url):
+def extract_full_article_text(url, extractor=None):
     """
-    Универсальный парсер: извлекает основной текст статьи по ссылке с помощью newspaper3k.
+    Универсальный парсер: извлекает основной текст статьи по ссылке зарегистрированным экстрактором
+    (по умолчанию TEXT_EXTRACTOR из конфига).
     Возвращает текст или пустую строку, если не удалось.
     """
+    name = extractor or TEXT_EXTRACTOR
+    func = TEXT_EXTRACTORS.get(name)
+    if func is None:
+        logger.error(f"Unknown text extractor: {name}")
+        return ""
+    return func(url)
+
+@register_text_extractor("newspaper")
+def extract_text_with_newspaper(url):
+    """
+    Извлекает основной текст статьи с помощью newspaper3k.
+    """
+    Article = get_backend("newspaper")
     for attempt in range(MAX_RETRIES):
         try:
             # Добавляем задержку между попытками